@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from scripts.query import query
+
 st.set_page_config(page_title="Emissions by Policy Pressure Level", layout="wide")
 
 st.markdown("## Are High-Pressure Countries Emitting More or Less?")
@@ -11,11 +13,12 @@ The violin plot below shows the distribution of country-level CO₂ emissions ac
 helping visualize if and how policy strictness aligns with real-world emissions outcomes.
 """)
 
-# Load data
-df = pd.read_csv("data/processed/co2_multi_year_predictions.csv")
-
-# Filter out missing pressure levels
-df = df[df["pressure_level"].notna()]
+# Load rows with a pressure level (filtered during the scan)
+df = query(
+    "co2_multi_year_predictions",
+    columns=["country", "year", "pressure_level", "co2"],
+    filters=[("pressure_level", "not_null")],
+)
 
 # Group by pressure level and sum CO₂ emissions
 summary = df.groupby("pressure_level", as_index=False)["co2"].sum()
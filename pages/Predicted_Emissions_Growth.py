@@ -1,7 +1,13 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import pycountry
+
+from scripts.explain_predictions import BASE_FEATURE, prediction_version
+from scripts.materialize_views import load_view, manifest_version
+from scripts.page_filters import filter_controls
+from scripts.query import query
+from scripts.tier_changes import events_version, transitions
 
 # Page setup
 st.set_page_config(layout="wide")
@@ -11,120 +17,213 @@ This page uses a trained machine learning model to identify countries most at ri
 The map below highlights countries with the highest predicted risk scores.
 """)
 
-# Load predictions
-df = pd.read_csv("data/processed/co2_multi_year_predictions.csv")  # Update path if needed!
+# ISO codes, shading and hover labels come from the nightly views job; cached per views release
+@st.cache_data
+def load_predictions(version):
+    return load_view("predicted_growth_view")
 
-# Get latest year
-latest_year = df["year"].max()
-map_data = df[df["year"] == latest_year].copy()
 
-# Map country names to ISO-3 codes
-def iso3(name):
+# Model + predictions release, hashed once per page run; None when the model pickle is not deployed
+def current_prediction_version():
     try:
-        return pycountry.countries.lookup(name).alpha_3
-    except LookupError:
+        return prediction_version()
+    except FileNotFoundError:
         return None
 
-map_data["iso_code"] = map_data["country"].map(iso3)
-map_data = map_data.dropna(subset=["iso_code", "predicted_growth"])
-
-# Build map (with EPS-style design)
-colorscale = [[0, "#00cc44"], [1, "#ef553b"]]
-fig = go.Figure(go.Choropleth(
-    locations=map_data["iso_code"],
-    z=map_data["predicted_growth"],
-    text=map_data["country"],
-    colorscale=colorscale,
-    showscale=False,
-    marker_line_color="#FFFFFF",
-    marker_line_width=0.5,
-))
-
-fig.update_geos(
-    projection_type="equirectangular",
-    bgcolor="#2E2E2E",
-    showocean=True, oceancolor="#023156",
-    showland=True, landcolor="#0e0f1e",
-    showcountries=True,
-    showcoastlines=True,
-    showframe=False,
-    domain=dict(x=[0, 1], y=[0, 1])
-)
-
-fig.update_layout(
-    margin=dict(t=20, l=0, r=0, b=20),
-    paper_bgcolor="#2E2E2E",
-    plot_bgcolor="#2E2E2E",
-    height=600,
-    font=dict(family="Helvetica Neue", color="#FFFFFF", size=16),
-    title=dict(
-        text="Predicted CO₂ Emissions Growth by Country",
-        x=0.5, y=0.98, xanchor="center",
-        font=dict(size=26, color="#e65100", family="Helvetica Neue Bold")
+
+@st.cache_data
+def load_attributions(version, year):
+    return query(
+        "prediction_attributions",
+        columns=["country", "feature", "feature_value", "feature_level", "contribution"],
+        filters=[
+            ("prediction_version", "==", version),
+            ("year", "==", year),
+            ("feature", "!=", BASE_FEATURE),
+        ],
+    )
+
+
+# Keyed on the model release and the event files, so a tier_changes run after a retrain is picked up
+@st.cache_data
+def load_flag_flips(version, events):
+    return transitions(measure="predicted_growth")
+
+
+@st.fragment
+def render_map(predictions, version):
+    map_data, year = filter_controls(predictions, "predicted")
+    if map_data.empty:
+        st.info("No countries match the selected filters.")
+        return
+
+    # Build map (with EPS-style design)
+    colorscale = [[0, "#00cc44"], [1, "#ef553b"]]
+    fig = go.Figure(go.Choropleth(
+        locations=map_data["iso_code"],
+        z=map_data["shade"],
+        zmin=0,
+        zmax=1,
+        text=map_data["country"],
+        hovertext=map_data["hovertext"],
+        hoverinfo="text",
+        colorscale=colorscale,
+        showscale=False,
+        marker_line_color="#FFFFFF",
+        marker_line_width=0.5,
+    ))
+
+    fig.update_geos(
+        projection_type="equirectangular",
+        bgcolor="#2E2E2E",
+        showocean=True, oceancolor="#023156",
+        showland=True, landcolor="#0e0f1e",
+        showcountries=True,
+        showcoastlines=True,
+        showframe=False,
+        domain=dict(x=[0, 1], y=[0, 1])
     )
-)
-
-fig.add_annotation(
-    text="Source: Green Scorecard ML Model Forecasts",
-    xref="paper", yref="paper",
-    x=0.005, y=-0.03,
-    xanchor="left", yanchor="bottom",
-    showarrow=False,
-    font=dict(size=16, color="#e65100", family="Helvetica Neue Bold")
-)
-
-fig.add_annotation(
-    text=f"Data Year: {latest_year}",
-    xref="paper", yref="paper",
-    x=0.995, y=-0.03,
-    xanchor="right", yanchor="bottom",
-    showarrow=False,
-    font=dict(size=16, color="#e65100", family="Helvetica Neue Bold")
-)
-
-# Add custom legend annotations at left side of the graph
-fig.add_shape(type="rect",
-              xref="paper", yref="paper",
-              x0=0.03, y0=0.49, x1=0.05, y1=0.51,
-              fillcolor="#00cc44",
-              line=dict(color="#FFFFFF"))
-fig.add_annotation(
-    text="On Track",
-    xref="paper", yref="paper",
-    x=0.055, y=0.502,
-    showarrow=False,
-    font=dict(size=14, color="#FFFFFF", family="Helvetica Neue Bold"),
-    align="left"
-)
-fig.add_shape(type="rect",
-              xref="paper", yref="paper",
-              x0=0.03, y0=0.45, x1=0.05, y1=0.47,
-              fillcolor="#ef553b",
-              line=dict(color="#FFFFFF"))
-fig.add_annotation(
-    text="At Risk",
-    xref="paper", yref="paper",
-    x=0.055, y=0.46,
-    showarrow=False,
-    font=dict(size=14, color="#FFFFFF", family="Helvetica Neue Bold"),
-    align="left"
-)
-
-left_col, _ = st.columns([3, 1])
-with left_col:
-    with st.container():
-        st.markdown(
-            """<style>
-            .element-container:has(.plot-container) {
-                background-color: #2E2E2E !important;
-            }
-            </style>""",
-            unsafe_allow_html=True,
+
+    fig.update_layout(
+        margin=dict(t=20, l=0, r=0, b=20),
+        paper_bgcolor="#2E2E2E",
+        plot_bgcolor="#2E2E2E",
+        height=600,
+        font=dict(family="Helvetica Neue", color="#FFFFFF", size=16),
+        title=dict(
+            text="Predicted CO₂ Emissions Growth by Country",
+            x=0.5, y=0.98, xanchor="center",
+            font=dict(size=26, color="#e65100", family="Helvetica Neue Bold")
         )
-        st.plotly_chart(fig, use_container_width=True)
+    )
+
+    fig.add_annotation(
+        text="Source: Green Scorecard ML Model Forecasts",
+        xref="paper", yref="paper",
+        x=0.005, y=-0.03,
+        xanchor="left", yanchor="bottom",
+        showarrow=False,
+        font=dict(size=16, color="#e65100", family="Helvetica Neue Bold")
+    )
+
+    fig.add_annotation(
+        text=f"Data Year: {year}",
+        xref="paper", yref="paper",
+        x=0.995, y=-0.03,
+        xanchor="right", yanchor="bottom",
+        showarrow=False,
+        font=dict(size=16, color="#e65100", family="Helvetica Neue Bold")
+    )
+
+    # Add custom legend annotations at left side of the graph
+    fig.add_shape(type="rect",
+                  xref="paper", yref="paper",
+                  x0=0.03, y0=0.49, x1=0.05, y1=0.51,
+                  fillcolor="#00cc44",
+                  line=dict(color="#FFFFFF"))
+    fig.add_annotation(
+        text="On Track",
+        xref="paper", yref="paper",
+        x=0.055, y=0.502,
+        showarrow=False,
+        font=dict(size=14, color="#FFFFFF", family="Helvetica Neue Bold"),
+        align="left"
+    )
+    fig.add_shape(type="rect",
+                  xref="paper", yref="paper",
+                  x0=0.03, y0=0.45, x1=0.05, y1=0.47,
+                  fillcolor="#ef553b",
+                  line=dict(color="#FFFFFF"))
+    fig.add_annotation(
+        text="At Risk",
+        xref="paper", yref="paper",
+        x=0.055, y=0.46,
+        showarrow=False,
+        font=dict(size=14, color="#FFFFFF", family="Helvetica Neue Bold"),
+        align="left"
+    )
+
+    left_col, _ = st.columns([3, 1])
+    with left_col:
+        with st.container():
+            st.markdown(
+                """<style>
+                .element-container:has(.plot-container) {
+                    background-color: #2E2E2E !important;
+                }
+                </style>""",
+                unsafe_allow_html=True,
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+    # Flags that flipped since the previous year or since the previous model release
+    st.markdown(f"#### Flag Changes in {year}")
+    flips = load_flag_flips(version, events_version())
+    flips = flips[(flips["year"] == year) & flips["country"].isin(map_data["country"])]
+    if flips.empty:
+        st.caption("No flag changes logged for this year. Run `python -m scripts.tier_changes` after a retrain.")
+    else:
+        flag_names = {"0": "On Track", "1": "At Risk"}
+        st.dataframe(
+            pd.DataFrame({
+                "Country": flips["country"],
+                "Compared With": np.where(flips["change"] == "year", flips["from_year"].astype(str), "previous model"),
+                "From": flips["from_value"].map(flag_names),
+                "To": flips["to_value"].map(flag_names),
+                "Detected": flips["detected_at"].dt.strftime("%Y-%m-%d"),
+            }),
+            hide_index=True,
+        )
+
+
+@st.fragment
+def render_drivers(attributions):
+    country = st.selectbox("Country", sorted(attributions["country"].unique()))
+    drivers = attributions[attributions["country"] == country].copy()
+    drivers = drivers.reindex(drivers["contribution"].abs().sort_values().index)
+
+    fig_drivers = go.Figure(go.Bar(
+        x=drivers["contribution"],
+        y=drivers["feature"],
+        orientation="h",
+        marker_color=["#ef553b" if c > 0 else "#00cc44" for c in drivers["contribution"]],
+        customdata=drivers["feature_level"].fillna(drivers["feature_value"].map("{:.4g}".format)),
+        hovertemplate="%{y}<br>Value: %{customdata}<br>Contribution: %{x:.3f}<extra></extra>",
+    ))
+    fig_drivers.update_layout(
+        margin=dict(t=20, l=0, r=0, b=20),
+        paper_bgcolor="#2E2E2E",
+        plot_bgcolor="#2E2E2E",
+        height=400,
+        font=dict(family="Helvetica Neue", color="#FFFFFF", size=14),
+        xaxis_title="Contribution to risk (log-odds)",
+    )
+
+    left_col, _ = st.columns([3, 1])
+    with left_col:
+        st.plotly_chart(fig_drivers, use_container_width=True)
+
+
+predictions = load_predictions(manifest_version())
+version = current_prediction_version()
+render_map(predictions, version)
 
 # Add context
 st.markdown("""
-This map shows the predicted CO₂ emissions growth for each country, using the latest year of forecast data.
+This map shows the predicted CO₂ emissions growth for each country; the filters above the map default to the latest year of forecast data.
 Colors indicate binary risk categories: green ("On Track") means no expected increase, red ("At Risk") means likely increase in emissions. Countries in red are likely to face rising emissions unless mitigating actions are taken.
-""")
\ No newline at end of file
+Colors follow the model's flag at its tuned threshold. When the model run includes its bootstrap ensemble, hovering shows the mean risk probability across ensemble members and its 90% range, so wide ranges mark the less certain calls.
+""")
+
+# ---- Per-country drivers ----
+st.markdown("### Why Is a Country Flagged?")
+st.markdown("""
+Each bar shows how much a model input pushed this country's prediction towards "At Risk" (red) or "On Track" (green),
+measured in log-odds. Values come from the precomputed attribution table for the current model version, for the latest year.
+""")
+
+attributions = load_attributions(version, int(predictions["year"].max())) if version else None
+if attributions is None or attributions.empty:
+    st.info("Feature attributions are not available for this model version yet. Run `python -m scripts.explain_predictions` to build them.")
+else:
+    render_drivers(attributions)
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Wide Climate Watch export (one column per year) and its canonical long-format store
+SOURCE_PATH = "data/processed/historical_emissions.csv"
+STORE_PATH = "data/processed/historical_emissions_long.parquet"
+
+KEYS = ["ISO", "Gas", "Sector", "year"]
+
+
+def build_store(source=SOURCE_PATH, dest=STORE_PATH):
+    """Melt the wide export once into a sorted (ISO, Gas, Sector, year) table."""
+    wide = pd.read_csv(source)
+    year_cols = [col for col in wide.columns if col.isdigit()]
+    long = wide.melt(
+        id_vars=["ISO", "Country", "Gas", "Sector", "Unit"],
+        value_vars=year_cols,
+        var_name="year",
+        value_name="emissions",
+    )
+    long["year"] = long["year"].astype(np.int16)
+    long = long.dropna(subset=["emissions"])
+    for col in ["ISO", "Gas", "Sector", "Unit"]:
+        long[col] = long[col].astype("category")
+    long = long.sort_values(KEYS, kind="stable").reset_index(drop=True)
+    long = long[KEYS + ["Country", "Unit", "emissions"]]
+
+    if dest:
+        tmp = dest + ".tmp"
+        long.to_parquet(tmp, index=False)
+        os.replace(tmp, dest)
+    return long
+
+
+def load_store(path=STORE_PATH, rebuild=False):
+    """Load the store indexed by (ISO, Gas, Sector, year), building it if missing."""
+    if rebuild or not os.path.exists(path):
+        long = build_store(dest=path)
+    else:
+        long = pd.read_parquet(path)
+    return long.set_index(KEYS).sort_index()
+
+
+def lookup(store, iso, gas, sector, year):
+    """Point lookup; the sorted MultiIndex resolves it by binary search."""
+    try:
+        return store.loc[(iso, gas, sector, year), "emissions"]
+    except KeyError:
+        return np.nan
+
+
+def series(store, gas, sector):
+    """Flat (ISO, year, emissions) frame for one gas/sector, sorted by ISO and year.
+
+    Raises KeyError for a gas/sector pair the store does not contain, rather
+    than returning an empty frame that joins to nothing.
+    """
+    mask = (store.index.get_level_values("Gas") == gas) & (store.index.get_level_values("Sector") == sector)
+    if not mask.any():
+        pairs = store.index.droplevel(["ISO", "year"]).unique().tolist()
+        raise KeyError(f"No {gas!r} / {sector!r} series in the emissions store; available: {pairs}")
+    return store[mask].reset_index()[["ISO", "Country", "year", "emissions"]]
+
+
+def asof_join(left, right, by="ISO", on="year", value_cols=("emissions",), lag=0, tolerance=None):
+    """Attach the latest right-hand value at or before `on - lag` for every left row.
+
+    Both sides are sorted once and matched with `pd.merge_asof`, so joining
+    onto millions of rows is a single sorted pass rather than a hash join.
+    `tolerance` bounds how many years back a match may come from
+    (0 means the exact year only). Row order of `left` is preserved.
+    """
+    value_cols = list(value_cols)
+    probe = pd.DataFrame({
+        "_row": np.arange(len(left)),
+        by: left[by].astype(object).fillna("").astype(str).to_numpy(),
+        on: left[on].to_numpy().astype(np.int64) - lag,
+    }).sort_values(on, kind="stable")
+
+    values = right[[by, on] + value_cols].copy()
+    values[by] = values[by].astype(str)
+    values[on] = values[on].astype(np.int64)
+    values = values.sort_values(on, kind="stable")
+
+    joined = pd.merge_asof(probe, values, on=on, by=by, tolerance=tolerance, direction="backward")
+    joined = joined.sort_values("_row")
+    return pd.DataFrame({col: joined[col].to_numpy() for col in value_cols}, index=left.index)
+
+
+if __name__ == "__main__":
+    long = build_store()
+    print(f"✅ {len(long)} rows written to {STORE_PATH}")
@@ -0,0 +1,106 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+# OECD Environmental Policy Stringency export (SDMX-CSV) and the dense cube built from it
+SOURCE_PATH = "data/raw/OECD,DF_EPS,+all.csv"
+CUBE_PATH = "data/processed/eps_cube.npy"
+INDEX_PATH = "data/processed/eps_cube_index.json"
+
+# SDMX code columns; the label twins (Country, Variable, Year, ...) are never read
+CODE_COLUMNS = ["COU", "VAR", "TIME_PERIOD", "OBS_VALUE"]
+
+
+def _codes(values, index_map):
+    """Map codes to dense integer positions, growing the map for unseen codes."""
+    return np.fromiter((index_map.setdefault(v, len(index_map)) for v in values), dtype=np.int32, count=len(values))
+
+
+def parse_sdmx(source=SOURCE_PATH, block_size=1 << 20):
+    """Stream the SDMX-CSV in record batches, reading only the code columns.
+
+    Returns (values, index) where values is a float32 array shaped
+    (country, variable, year) filled with NaN for missing observations and
+    index holds the sorted ISO codes, variable codes and years for each axis.
+    """
+    reader = pv.open_csv(
+        source,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            include_columns=CODE_COLUMNS,
+            column_types={"COU": pa.string(), "VAR": pa.string(), "TIME_PERIOD": pa.int32(), "OBS_VALUE": pa.float32()},
+        ),
+    )
+    maps = {"COU": {}, "VAR": {}, "TIME_PERIOD": {}}
+    positions = {col: [] for col in maps}
+    observations = []
+    for batch in reader:
+        for col, index_map in maps.items():
+            positions[col].append(_codes(batch.column(col).to_pylist(), index_map))
+        observations.append(batch.column("OBS_VALUE").to_numpy(zero_copy_only=False))
+
+    # Reorder each axis so countries and variables are alphabetical and years ascend
+    axes = {}
+    for col, index_map in maps.items():
+        labels = np.array(list(index_map), dtype=object)
+        order = np.argsort(labels.astype(str), kind="stable")
+        remap = np.empty(len(labels), dtype=np.int32)
+        remap[order] = np.arange(len(labels), dtype=np.int32)
+        axes[col] = (labels[order].tolist(), remap[np.concatenate(positions[col])])
+
+    values = np.full(tuple(len(axes[col][0]) for col in maps), np.nan, dtype=np.float32)
+    values[axes["COU"][1], axes["VAR"][1], axes["TIME_PERIOD"][1]] = np.concatenate(observations)
+
+    index = {
+        "countries": axes["COU"][0],
+        "variables": axes["VAR"][0],
+        "years": [int(y) for y in axes["TIME_PERIOD"][0]],
+    }
+    return values, index
+
+
+def build_cube(source=SOURCE_PATH, cube_path=CUBE_PATH, index_path=INDEX_PATH):
+    """Parse the raw export and persist the cube (.npy) plus its axis labels (.json)."""
+    values, index = parse_sdmx(source)
+    tmp = cube_path + ".tmp.npy"
+    np.save(tmp, values)
+    os.replace(tmp, cube_path)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(index_path + ".tmp", index_path)
+    return values, index
+
+
+def load_cube(cube_path=CUBE_PATH, index_path=INDEX_PATH, mmap=True):
+    """Load the persisted cube, memory-mapped by default so workers share pages."""
+    if not (os.path.exists(cube_path) and os.path.exists(index_path)):
+        return build_cube(cube_path=cube_path, index_path=index_path)
+    values = np.load(cube_path, mmap_mode="r" if mmap else None)
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    return values, index
+
+
+def cube_frame(values, index, variables=None, countries=None):
+    """Flatten (a slice of) the cube to one row per (iso_code, year), one column per variable."""
+    variables = variables or index["variables"]
+    countries = countries or index["countries"]
+    var_pos = [index["variables"].index(v) for v in variables]
+    cou_pos = [index["countries"].index(c) for c in countries]
+    block = np.asarray(values[np.ix_(cou_pos, var_pos, range(len(index["years"])))])
+
+    # (country, variable, year) -> (country, year, variable) -> rows
+    flat = block.transpose(0, 2, 1).reshape(-1, len(variables))
+    frame = pd.DataFrame(flat, columns=variables)
+    frame.insert(0, "iso_code", np.repeat(countries, len(index["years"])))
+    frame.insert(1, "year", np.tile(index["years"], len(countries)))
+    return frame
+
+
+if __name__ == "__main__":
+    values, index = build_cube()
+    print(f"✅ EPS cube {values.shape} (country × variable × year) saved to {CUBE_PATH}")
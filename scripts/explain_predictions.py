@@ -0,0 +1,87 @@
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from scripts.features import apply_vocabulary, categorical_features, load_vocabulary
+from scripts.model_paths import DEPLOYED_MODEL_PATH, DEPLOYED_PREDICTIONS_PATH, vocabulary_path
+
+MODEL_PATH = DEPLOYED_MODEL_PATH
+PREDICTIONS_PATH = DEPLOYED_PREDICTIONS_PATH
+ATTRIBUTIONS_PATH = "data/processed/prediction_attributions.parquet"
+
+# Row standing for the model's expected log-odds before any feature contributes
+BASE_FEATURE = "(base value)"
+
+
+def prediction_version(model_path=MODEL_PATH, predictions_path=PREDICTIONS_PATH):
+    """Short content hash identifying one model + predictions release."""
+    digest = hashlib.sha256()
+    for path in (model_path, predictions_path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def feature_contributions(pipeline, X):
+    """TreeSHAP contributions (log-odds) for every row in one booster call.
+
+    The pipeline's scaling step is applied first so the booster sees the
+    inputs it was trained on; scaling is per-feature and monotone, so each
+    scaled feature's contribution is the original feature's contribution.
+    Returns the feature names in booster order and an (n_rows, n_features + 1)
+    array whose last column is the base value.
+    """
+    X_scaled = pipeline.named_steps["scaler"].transform(X)
+    names = list(X_scaled.columns) if isinstance(X_scaled, pd.DataFrame) else list(X.columns)
+    booster = pipeline.named_steps["model"].get_booster()
+    dmatrix = xgb.DMatrix(X_scaled, feature_names=names, missing=np.nan, enable_categorical=True)
+    return names, booster.predict(dmatrix, pred_contribs=True)
+
+
+def build_attributions(model_path=MODEL_PATH, predictions_path=PREDICTIONS_PATH, dest=ATTRIBUTIONS_PATH):
+    """Explain every (country, year) prediction and persist a long columnar table."""
+    pipeline = joblib.load(model_path)
+    features = list(pipeline.feature_names_in_)
+    categorical = categorical_features(pipeline)
+    df = pd.read_csv(predictions_path, usecols=["country", "year"] + features)
+    if categorical:
+        df = apply_vocabulary(df, load_vocabulary(vocabulary_path(model_path)), categorical)
+
+    names, contribs = feature_contributions(pipeline, df[features])
+    names = names + [BASE_FEATURE]
+
+    # Numeric inputs go in feature_value, categorical levels in feature_level
+    raw_values = np.column_stack([
+        np.full(len(df), np.nan) if name in categorical or name == BASE_FEATURE else df[name].to_numpy(dtype=float)
+        for name in names
+    ])
+    raw_levels = np.column_stack([
+        df[name].astype(object).to_numpy() if name in categorical else np.full(len(df), None, dtype=object)
+        for name in names
+    ])
+
+    attributions = pd.DataFrame({
+        "prediction_version": prediction_version(model_path, predictions_path),
+        "country": np.repeat(df["country"].to_numpy(), len(names)),
+        "year": np.repeat(df["year"].to_numpy(), len(names)),
+        "feature": np.tile(names, len(df)),
+        "feature_value": raw_values.ravel(),
+        "feature_level": raw_levels.ravel(),
+        "contribution": contribs.ravel().astype(np.float32),
+    })
+
+    tmp = dest + ".tmp"
+    attributions.to_parquet(tmp, index=False)
+    os.replace(tmp, dest)
+    return attributions
+
+
+if __name__ == "__main__":
+    attributions = build_attributions()
+    version = attributions["prediction_version"].iloc[0]
+    print(f"✅ {len(attributions)} attributions (version {version}) saved to {ATTRIBUTIONS_PATH}")
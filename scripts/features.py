@@ -0,0 +1,85 @@
+import json
+import os
+
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+# Low-cardinality labels fed to XGBoost as native categoricals instead of dummies
+CATEGORICAL_FEATURES = ["region", "income_group", "pressure_level"]
+
+
+def load_vocabulary(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_vocabulary(vocabulary, path):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def update_vocabulary(vocabulary, df, columns=CATEGORICAL_FEATURES):
+    """Append unseen levels to each column's vocabulary.
+
+    Existing levels keep their position, so category codes stay stable
+    between runs and a saved model keeps reading them correctly.
+    """
+    updated = {}
+    for col in columns:
+        levels = list(vocabulary.get(col, []))
+        seen = set(levels)
+        levels += sorted(v for v in df[col].dropna().astype(str).unique() if v not in seen)
+        updated[col] = levels
+    return {**vocabulary, **updated}
+
+
+def apply_vocabulary(df, vocabulary, columns=CATEGORICAL_FEATURES):
+    """Cast columns to categoricals with the persisted levels (unknown levels become NaN)."""
+    df = df.copy()
+    for col in columns:
+        if col not in vocabulary:
+            raise KeyError(f"No category vocabulary for {col!r}; retrain to create the model's vocabulary file")
+        df[col] = pd.Categorical(df[col].astype(str).where(df[col].notna()), categories=vocabulary[col])
+    return df
+
+
+def build_pipeline(X, **params):
+    """Scale numeric columns and pass categoricals straight to XGBoost.
+
+    Categorical columns are recognised by their pandas dtype.
+    """
+    categorical = [col for col in X.columns if isinstance(X[col].dtype, pd.CategoricalDtype)]
+    numeric = [col for col in X.columns if col not in categorical]
+    preprocessor = ColumnTransformer(
+        [("num", StandardScaler(), numeric)],
+        remainder="passthrough",
+        verbose_feature_names_out=False,
+    ).set_output(transform="pandas")
+    return Pipeline([
+        ("scaler", preprocessor),
+        ("model", XGBClassifier(enable_categorical=True, **params)),
+    ])
+
+
+def categorical_features(pipeline):
+    """Features a fitted pipeline passes through as categoricals."""
+    preprocessor = pipeline.named_steps["scaler"]
+    if not isinstance(preprocessor, ColumnTransformer):
+        return []
+    scaled = set(preprocessor.named_transformers_["num"].feature_names_in_)
+    return [col for col in preprocessor.feature_names_in_ if col not in scaled]
+
+
+def numeric_scaler(pipeline):
+    """The fitted StandardScaler and the columns it scales."""
+    preprocessor = pipeline.named_steps["scaler"]
+    if isinstance(preprocessor, ColumnTransformer):
+        scaler = preprocessor.named_transformers_["num"]
+        return scaler, list(scaler.feature_names_in_)
+    return preprocessor, list(pipeline.feature_names_in_)
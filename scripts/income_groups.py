@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.emissions_store import asof_join
+
+# World Bank historical income classifications (one column per fiscal year from 1987)
+SOURCE_PATH = "data/raw/country_analytical_history_table.csv"
+INTERVALS_PATH = "data/processed/income_group_intervals.csv"
+
+# valid_to for a classification still in effect at the end of the table
+OPEN_ENDED = 9999
+
+
+def parse_history(source=SOURCE_PATH):
+    """Turn the multi-row-header table into (iso_code, country, valid_from, valid_to, income_group) intervals."""
+    raw = pd.read_csv(source, header=None, dtype=str)
+
+    # The year header is the first row with a year in the first data column
+    header_row = raw.index[raw[2].fillna("").str.fullmatch(r"\d{4}")][0]
+    years = pd.to_numeric(raw.loc[header_row], errors="coerce")
+    year_cols = [col for col in raw.columns[2:] if not np.isnan(years[col])]
+
+    table = raw.loc[header_row + 1:, [0, 1] + year_cols].dropna(subset=[0])
+    table.columns = ["iso_code", "country"] + [int(years[col]) for col in year_cols]
+    long = table.melt(id_vars=["iso_code", "country"], var_name="year", value_name="income_group")
+    long["year"] = long["year"].astype(int)
+
+    # ".." means not classified that year; "*" flags a revised classification
+    long["income_group"] = long["income_group"].str.rstrip("*")
+    long = long[long["income_group"].isin(["L", "LM", "UM", "H"])]
+    long = long.sort_values(["iso_code", "year"]).reset_index(drop=True)
+
+    # Run-length encode consecutive years with the same group into one interval
+    new_run = (
+        (long["iso_code"] != long["iso_code"].shift())
+        | (long["income_group"] != long["income_group"].shift())
+        | (long["year"] != long["year"].shift() + 1)
+    )
+    long["run"] = new_run.cumsum()
+    intervals = long.groupby("run").agg(
+        iso_code=("iso_code", "first"),
+        country=("country", "first"),
+        valid_from=("year", "min"),
+        valid_to=("year", "max"),
+        income_group=("income_group", "first"),
+    ).reset_index(drop=True)
+
+    last_year = long["year"].max()
+    intervals.loc[intervals["valid_to"] == last_year, "valid_to"] = OPEN_ENDED
+    return intervals
+
+
+def build_intervals(source=SOURCE_PATH, dest=INTERVALS_PATH):
+    intervals = parse_history(source)
+    intervals.to_csv(dest, index=False)
+    return intervals
+
+
+def load_intervals(path=INTERVALS_PATH):
+    if not os.path.exists(path):
+        return build_intervals(dest=path)
+    return pd.read_csv(path)
+
+
+def income_group_asof(frame, intervals, by="iso_code", on="year"):
+    """Income group in effect for every (by, on) row of `frame`, in one sorted pass.
+
+    Rows before a country's first classification, inside a ".." gap or with an
+    unknown code come back as NaN.
+    """
+    starts = intervals.rename(columns={"iso_code": by, "valid_from": on})
+    matched = asof_join(frame, starts, by=by, on=on, value_cols=["income_group", "valid_to"])
+    in_effect = frame[on].to_numpy() <= matched["valid_to"].to_numpy(dtype=float)
+    return matched["income_group"].where(in_effect)
+
+
+if __name__ == "__main__":
+    intervals = build_intervals()
+    print(f"✅ {len(intervals)} income group intervals saved to {INTERVALS_PATH}")
@@ -0,0 +1,208 @@
+import gc
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+# Capacity-planning run: `python -m scripts.load_test` from the project root
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+INTERACTIONS_PER_SESSION = 5
+RERUN_TIMEOUT = 120  # seconds before AppTest gives up on a single rerun
+SEED = 42
+RESULTS_PATH = "outputs/load_test_results.csv"
+CAPACITY_PATH = "outputs/load_test_capacity.csv"
+CURVES_PATH = "outputs/load_test_curves.png"
+
+# Per-replica capacity assumptions: a user waits this long between interactions,
+# and a replica should stay below this share of its one process's time
+THINK_TIME_S = 10
+TARGET_UTILISATION = 0.7
+
+PROCESS_NOTE = (
+    "Concurrency N runs N worker processes, each with its own interpreter and cache, so these "
+    "curves measure N CPU cores rather than one Streamlit replica; see the per-replica estimate."
+)
+
+
+def app_scripts():
+    return ["Homepage.py"] + sorted(glob.glob("pages/*.py"))
+
+
+def rss_bytes():
+    """Resident memory of this process right now (Linux); the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _settable(widget):
+    """Options that can be handed back to the widget as values.
+
+    AppTest only sees display labels; a label is usable when the widget's
+    format_func maps it to itself (true for plain values and for the income
+    group labels, which fall through INCOME_LABELS.get).
+    """
+    options = []
+    for option in widget.options:
+        try:
+            if widget.format_func(option) == option:
+                options.append(option)
+        except Exception:
+            pass
+    return options
+
+
+def random_interaction(at, rng):
+    """Change one randomly chosen widget the way a user would; False if nothing can be changed."""
+    widgets = [w for w in [*at.selectbox, *at.radio, *at.multiselect] if _settable(w)] + list(at.checkbox)
+    if not widgets:
+        return False
+    widget = widgets[rng.integers(len(widgets))]
+
+    if widget.type == "checkbox":
+        widget.set_value(not widget.value)
+    elif widget.type == "multiselect":
+        options = _settable(widget)
+        picks = rng.choice(len(options), size=rng.integers(0, min(3, len(options)) + 1), replace=False)
+        widget.set_value([options[i] for i in picks])
+    else:
+        options = _settable(widget)
+        widget.set_value(options[rng.integers(len(options))])
+    return True
+
+
+def run_session(script, rng, interactions=INTERACTIONS_PER_SESSION):
+    """One simulated user: the initial load, then random interactions, timing every rerun."""
+    at = AppTest.from_file(script, default_timeout=RERUN_TIMEOUT)
+    timings, errors = [], 0
+    for step in range(interactions + 1):
+        if step and not random_interaction(at, rng):
+            break
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+        errors += bool(at.exception)
+    return at, timings, errors
+
+
+def _session_worker(script, seed, barrier):
+    """Warm this worker's caches, wait for the other sessions, then run one timed session."""
+    rng = np.random.default_rng(seed)
+    run_session(script, rng, interactions=0)
+    gc.collect()
+    rss_before = rss_bytes()
+    barrier.wait()
+    started = time.time()
+    at, timings, errors = run_session(script, rng)  # keep `at` alive so its state counts below
+    finished = time.time()
+    gc.collect()
+    return timings, errors, started, finished, rss_bytes() - rss_before
+
+
+def run_level(script, concurrency, seed=SEED):
+    """Run `concurrency` sessions of one script at once and summarise their reruns.
+
+    AppTest installs a process-wide mock runtime for every run, so sessions
+    in one process cannot overlap; each session gets its own worker process
+    instead. Workers warm their own st.cache_data before the barrier, which
+    stands in for the cache a replica shares between sessions, and memory
+    per session is the resident-memory growth of a worker after warm-up.
+    """
+    with Manager() as manager, ProcessPoolExecutor(max_workers=concurrency) as pool:
+        barrier = manager.Barrier(concurrency)
+        futures = [pool.submit(_session_worker, script, [seed, concurrency, i], barrier) for i in range(concurrency)]
+        sessions = [future.result() for future in futures]
+
+    timings = np.concatenate([session[0] for session in sessions]) * 1000
+    elapsed = max(session[3] for session in sessions) - min(session[2] for session in sessions)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "script": script,
+        "concurrency": concurrency,
+        "reruns": len(timings),
+        "errors": sum(session[1] for session in sessions),
+        "mean_ms": round(timings.mean(), 1),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "p99_ms": round(p99, 1),
+        "throughput_rps": round(len(timings) / elapsed, 2),
+        "mem_per_session_mb": round(np.mean([max(session[4], 0) for session in sessions]) / 2**20, 2),
+    }
+
+
+def load_test(scripts=None, levels=CONCURRENCY_LEVELS, seed=SEED):
+    """Run every script at every concurrency level; level 1 is always included for replica_capacity."""
+    print(PROCESS_NOTE)
+    rows = []
+    for script in scripts or app_scripts():
+        for concurrency in sorted(set(levels) | {1}):
+            row = run_level(script, concurrency, seed)
+            rows.append(row)
+            print(f"{script} × {concurrency}: p50 {row['p50_ms']} ms, p95 {row['p95_ms']} ms, "
+                  f"{row['throughput_rps']} reruns/s, {row['mem_per_session_mb']} MB/session, {row['errors']} errors")
+    return pd.DataFrame(rows)
+
+
+def replica_capacity(results, think_time=THINK_TIME_S, utilisation=TARGET_UTILISATION):
+    """Sessions one replica can serve, from the single-session (one process) runs.
+
+    A replica executes reruns in one Python process, so its throughput is
+    bounded by 1000 / mean rerun time. Each user asks for one rerun every
+    `think_time` seconds, so a replica kept at `utilisation` serves about
+    throughput × think_time × utilisation sessions. Memory per session is
+    the resident-memory growth of one session after the caches are warm.
+    """
+    single = results[results["concurrency"] == 1].set_index("script")
+    replica_rps = 1000 / single["mean_ms"]
+    return pd.DataFrame({
+        "mean_rerun_ms": single["mean_ms"],
+        "replica_reruns_per_s": replica_rps.round(2),
+        "sessions_per_replica": np.floor(replica_rps * think_time * utilisation).astype(int),
+        "mem_per_session_mb": single["mem_per_session_mb"],
+    }).reset_index()
+
+
+def plot_curves(results, dest=CURVES_PATH):
+    """Throughput and p95 latency against concurrent sessions, one line per script."""
+    fig, (ax_rps, ax_p95) = plt.subplots(1, 2, figsize=(14, 5))
+    for script, rows in results.groupby("script"):
+        label = os.path.splitext(os.path.basename(script))[0]
+        ax_rps.plot(rows["concurrency"], rows["throughput_rps"], marker="o", label=label)
+        ax_p95.plot(rows["concurrency"], rows["p95_ms"], marker="o", label=label)
+    ax_rps.set(title="Throughput (one process per session)", xlabel="Concurrent sessions / worker processes", ylabel="Reruns per second")
+    ax_p95.set(title="p95 Rerun Latency (one process per session)", xlabel="Concurrent sessions / worker processes", ylabel="Milliseconds")
+    for ax in (ax_rps, ax_p95):
+        ax.set_xscale("log", base=2)
+        ax.set_xticks(sorted(results["concurrency"].unique()), labels=sorted(results["concurrency"].unique()))
+    ax_rps.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(dest)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    results = load_test()
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    results.to_csv(RESULTS_PATH, index=False)
+    plot_curves(results)
+    capacity = replica_capacity(results)
+    capacity.to_csv(CAPACITY_PATH, index=False)
+    print(results.to_string(index=False))
+    print(PROCESS_NOTE)
+    print(f"\nPer-replica estimate ({THINK_TIME_S}s think time, {TARGET_UTILISATION:.0%} utilisation):")
+    print(capacity.to_string(index=False))
+    print(f"✅ Load test results saved to {RESULTS_PATH}, {CAPACITY_PATH} and {CURVES_PATH}")
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pycountry
+
+from scripts.income_groups import INTERVALS_PATH, income_group_asof, load_intervals
+from scripts.query import DATASETS, load_dataset, query
+
+# One render-ready table per dashboard page; run nightly with `python -m scripts.materialize_views`
+VIEWS_DIR = "data/processed/views"
+MANIFEST_PATH = os.path.join(VIEWS_DIR, "manifest.json")
+
+# Inputs whose contents define a views release (this module included, so builder fixes bump it too)
+SOURCES = [DATASETS["co2_multi_year_predictions"], DATASETS["co2_policy_merged"], DATASETS["country_regions"], INTERVALS_PATH, __file__]
+
+# Country names Plotly's "country names" locations do not recognise
+PLOTLY_COUNTRY_NAMES = {
+    "South Korea": "Korea, Rep.",
+    "Czechia": "Czech Republic",
+    "Myanmar": "Burma",
+    "Eswatini": "Swaziland",
+    "Democratic Republic of Congo": "Democratic Republic of the Congo",
+    "Republic of Congo": "Congo (Brazzaville)",
+    "United States": "United States of America",
+    "Russia": "Russian Federation",
+    "Vietnam": "Viet Nam",
+    "Syria": "Syrian Arab Republic",
+    "Laos": "Lao PDR",
+    "Cape Verde": "Cabo Verde",
+}
+
+# Growth-risk tiers and their position on the page's stepped colour scale
+RISK_SCORES = {"on_track": 0.0, "at_risk": 0.5, "non_compliant": 1.0}
+
+
+def iso3(name):
+    try:
+        return pycountry.countries.lookup(name).alpha_3
+    except LookupError:
+        return None
+
+
+def iso3_codes(countries):
+    """ISO-3 code per country name, looking each distinct name up only once."""
+    return countries.map({name: iso3(name) for name in countries.unique()})
+
+
+def blank_to_nan(df):
+    """Treat empty or whitespace-only strings as missing, however the source was parsed."""
+    text = df.select_dtypes(include="object").columns
+    df[text] = df[text].replace(r"^\s*$", np.nan, regex=True)
+    return df
+
+
+def views_version(sources=SOURCES):
+    """Short content hash of the source tables one views release was built from."""
+    digest = hashlib.sha256()
+    for path in sources:
+        stem, ext = os.path.splitext(path)
+        if ext == ".csv" and os.path.exists(stem + ".parquet"):
+            path = stem + ".parquet"
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def growth_risk_view():
+    """Year-on-year CO₂ growth, tier and hover label per country-year (Emissions_Growth_Risk)."""
+    df = query(
+        "co2_multi_year_predictions",
+        columns=["country", "year", "co2", "eps_score", "pressure_level", "region", "income_group"],
+    )
+    df = blank_to_nan(df)
+    df["country"] = df["country"].replace({"South Korea": "Korea, Rep."})
+    df = df.sort_values(["country", "year"])
+    co2_last_year = df.groupby("country")["co2"].shift(1)
+    df["co2_growth_prct"] = ((df["co2"] - co2_last_year) / co2_last_year * 100).round(2)
+
+    # Tiers: >5% non-compliant, 0–5% at risk, otherwise on track
+    growth = df["co2_growth_prct"]
+    df["growth_risk"] = np.select([growth > 5, growth > 0], ["non_compliant", "at_risk"], "on_track")
+    df["risk_score"] = df["growth_risk"].map(RISK_SCORES)
+    df["iso_code"] = iso3_codes(df["country"])
+    df = df[growth.notna() & df["iso_code"].notna()]
+
+    df["hovertext"] = (
+        df["country"] + "<br>Emissions Growth: " + df["co2_growth_prct"].map("{:.2f}".format)
+        + "%<br>EPS: " + df["eps_score"].map("{:g}".format).replace("nan", "n/a")
+        + "<br>Pressure: " + df["pressure_level"].fillna("n/a")
+    )
+    return df[["country", "iso_code", "year", "region", "income_group", "pressure_level",
+               "co2_growth_prct", "growth_risk", "risk_score", "hovertext"]].reset_index(drop=True)
+
+
+def predicted_growth_view():
+    """Model flag (and ensemble risk range when available) per country-year (Predicted_Emissions_Growth)."""
+    risk_columns = ["risk_probability", "risk_lower", "risk_upper"]
+    available = set(load_dataset("co2_multi_year_predictions").schema.names)
+    has_risk = set(risk_columns) <= available
+    df = query(
+        "co2_multi_year_predictions",
+        columns=["country", "year", "predicted_growth", "region", "income_group", "pressure_level"]
+        + (risk_columns if has_risk else []),
+    )
+    df = blank_to_nan(df)
+    df["iso_code"] = iso3_codes(df["country"])
+    df = df.dropna(subset=["iso_code", "predicted_growth"])
+
+    # Shade by the thresholded flag so colours match the On Track / At Risk legend;
+    # the ensemble probability and its range go in the hover text when available
+    df["shade"] = df["predicted_growth"].astype(float)
+    df["hovertext"] = df["country"] + "<br>" + df["predicted_growth"].map({0: "On Track", 1: "At Risk"})
+    if has_risk:
+        df[risk_columns] = df[risk_columns].round(2)
+        df["hovertext"] += (
+            "<br>Risk probability: " + df["risk_probability"].map("{:.0%}".format)
+            + " (90% range " + df["risk_lower"].map("{:.0%}".format) + "–" + df["risk_upper"].map("{:.0%}".format) + ")"
+        )
+    return df.reset_index(drop=True)
+
+
+def eps_map_view():
+    """EPS score with region and year-correct income group per country-year (EPS_Score_by_Country)."""
+    df = query(
+        "co2_policy_merged",
+        columns=["country", "iso_code", "year", "co2_per_capita", "eps_score", "pressure_level"],
+        filters=[("co2", "not_null")],
+    )
+    df = df.merge(query("country_regions"), on="iso_code", how="left")
+    df["income_group"] = income_group_asof(df, load_intervals())
+    df = blank_to_nan(df)
+    df["country"] = df["country"].replace(PLOTLY_COUNTRY_NAMES)
+    df[["co2_per_capita", "eps_score"]] = df[["co2_per_capita", "eps_score"]].round(2)
+    return df
+
+
+VIEWS = {
+    "growth_risk_view": growth_risk_view,
+    "predicted_growth_view": predicted_growth_view,
+    "eps_map_view": eps_map_view,
+}
+
+
+def view_path(name, views_dir=VIEWS_DIR):
+    return os.path.join(views_dir, f"{name}.parquet")
+
+
+def write_view(frame, dest, version):
+    """Write one view atomically, stamping the release version into the Parquet metadata."""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"view_version": version.encode()})
+    pq.write_table(table, dest + ".tmp")
+    os.replace(dest + ".tmp", dest)
+
+
+def materialize(views_dir=VIEWS_DIR):
+    """Rebuild every view; the manifest is replaced last so it only ever names complete files."""
+    os.makedirs(views_dir, exist_ok=True)
+    version = views_version()
+    rows = {}
+    for name, build in VIEWS.items():
+        frame = build()
+        write_view(frame, view_path(name, views_dir), version)
+        rows[name] = len(frame)
+
+    manifest = {
+        "version": version,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": rows,
+    }
+    manifest_path = os.path.join(views_dir, "manifest.json")
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def manifest_version(path=MANIFEST_PATH):
+    """Version of the views currently on disk (None before the first run); pages key their cache on it."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["version"]
+
+
+def load_view(name):
+    """Read a materialized view, building it in-process if the job has not run yet."""
+    if os.path.exists(view_path(name)):
+        return query(name)
+    return VIEWS[name]()
+
+
+if __name__ == "__main__":
+    manifest = materialize()
+    print(f"✅ {len(manifest['rows'])} views (version {manifest['version']}) saved to {VIEWS_DIR}")
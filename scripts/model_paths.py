@@ -0,0 +1,20 @@
+import os
+
+# Training writes here; the dashboard and offline jobs score with the released copies.
+# A release moves the model and the predictions it made together, so flags and attributions agree.
+TRAINED_MODEL_PATH = "data/multi_year_co2_model.pkl"
+TRAINED_PREDICTIONS_PATH = "data/co2_multi_year_predictions.csv"
+ENSEMBLE_PATH = "data/multi_year_co2_ensemble.pkl"
+DEPLOYED_MODEL_PATH = "data/model/multi_year_co2_model.pkl"
+DEPLOYED_PREDICTIONS_PATH = "data/processed/co2_multi_year_predictions.csv"
+
+
+# Files that belong to one model pickle sit next to it, so releasing a model means copying all three
+def meta_path(model_path):
+    """Training window, tuned threshold and F1 recorded for a model pickle."""
+    return os.path.splitext(model_path)[0] + "_meta.json"
+
+
+def vocabulary_path(model_path):
+    """Category vocabulary a model pickle was trained with."""
+    return os.path.splitext(model_path)[0] + "_categories.json"
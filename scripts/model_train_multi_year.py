@@ -1,30 +1,33 @@
 import pandas as pd
 from sklearn.model_selection import train_test_split, RandomizedSearchCV
-from xgboost import XGBClassifier
-from sklearn.metrics import classification_report
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
+from sklearn.metrics import classification_report, f1_score
 import joblib
 import numpy as np
 
+from scripts.emissions_store import asof_join
+from scripts.ensemble import ensemble_predict_proba, fit_ensemble, summarize
+from scripts.features import CATEGORICAL_FEATURES, apply_vocabulary, build_pipeline, load_vocabulary, save_vocabulary, update_vocabulary
+from scripts.income_groups import income_group_asof, load_intervals
+from scripts.model_paths import DEPLOYED_MODEL_PATH, DEPLOYED_PREDICTIONS_PATH, ENSEMBLE_PATH, TRAINED_MODEL_PATH, TRAINED_PREDICTIONS_PATH, meta_path, vocabulary_path
+from scripts.query import query
+from scripts.warm_start import best_f1_threshold, continue_boosting, feature_drift, load_model_meta, save_model_meta
+
 # Configurable test year for stress testing
 FORECAST_MODE = False  # Set to True to forecast next year based on latest year
 
-# Load and reshape wide-format emissions data
-hist = pd.read_csv("data/processed/historical_emissions.csv")
-
-# Filter for total CO2 emissions, all sectors
-hist = hist[(hist["Gas"] == "CO2") & (hist["Sector"] == "Total including LUCF")]
+# Bootstrap ensemble size for risk confidence intervals
+N_ENSEMBLE_MEMBERS = 20
 
-# Melt year columns into long format
-year_cols = [col for col in hist.columns if col.isdigit()]
-hist_long = hist.melt(id_vars=["Country", "ISO"], value_vars=year_cols, var_name="year", value_name="co2")
-hist_long["year"] = hist_long["year"].astype(str)
+# Warm-start update: continue boosting the saved model on newly appended years
+UPDATE_MODE = False  # Set to True to update instead of running the full search
+UPDATE_ROUNDS = 25  # Trees added per update
+DRIFT_LIMIT = 0.5  # Max feature mean shift (in training std devs) before a full retrain
+F1_DROP_LIMIT = 0.15  # Max F1 drop on the new rows before a full retrain
 
-# Compute 3-year rolling standard deviation (volatility)
-hist_long["year_num"] = hist_long["year"].astype(int)
-hist_long = hist_long.sort_values(by=["ISO", "year_num"])
-hist_long["co2_volatility_3yr"] = hist_long.groupby("ISO")["co2"].transform(lambda x: x.rolling(window=3, min_periods=2).std())
+# Meta and category vocabulary are saved next to the pickle they belong to
+MODEL_PATH = TRAINED_MODEL_PATH
+META_PATH = meta_path(MODEL_PATH)
+VOCABULARY_PATH = vocabulary_path(MODEL_PATH)
 
 # Load dataset
 df = pd.read_csv("data/processed/co2_predictions_with_income.csv")
@@ -51,17 +54,24 @@ df["first_eps_year"] = df["first_eps_year"].round()
 df["policy_lag_years"] = df["year"] - df["first_eps_year"]
 df["policy_lag_years"] = df["policy_lag_years"].clip(lower=0)
 
-# Merge current and prior year emissions to compute CO₂ trend
-df["year"] = df["year"].astype(str)
-hist_long = hist_long.rename(columns={"Country": "country", "year": "prev_year", "co2": "co2_last_year"})
-hist_long["prev_year"] = hist_long["prev_year"].astype(str)
-df = pd.merge(
-    df,
-    hist_long[["country", "prev_year", "co2_last_year", "co2_volatility_3yr"]],
-    left_on=["country", "year"],
-    right_on=["country", "prev_year"],
-    how="left"
-)
+# Attach prior-year CO₂ and its 3-year volatility with a sorted as-of join on country.
+# They come from this table's own co2 column: the emissions store only holds all-GHG
+# totals, which are in different units.
+co2_history = df[["country", "year", "co2"]].dropna().sort_values(["country", "year"])
+co2_history["co2_volatility_3yr"] = co2_history.groupby("country")["co2"].transform(lambda x: x.rolling(window=3, min_periods=2).std())
+df["prev_year"] = df["year"] - 1
+df[["co2_last_year", "co2_volatility_3yr"]] = asof_join(
+    df, co2_history, by="country", value_cols=["co2", "co2_volatility_3yr"], lag=1, tolerance=0
+).to_numpy()
+
+# ISO codes for the income group lookup, filling gaps from the emissions table's country names
+countries = query("historical_emissions", columns=["ISO", "Country"])
+iso_by_country = dict(zip(countries["Country"], countries["ISO"]))
+df["ISO"] = df["iso_code"].fillna(df["country"].map(iso_by_country))
+
+# Rebuild income group from the World Bank history, as in effect for each year
+df["income_group"] = income_group_asof(df, load_intervals(), by="ISO")
+df = df.drop(columns="ISO")
 df["co2_growth_trend"] = df["co2"] / (df["co2_last_year"] + 1e-6)
 
 # Drop rows with missing values in key columns
@@ -87,23 +97,15 @@ df["income_x_intensity"] = df["income_group_encoded"] * df["intensity_ratio"]
 region_df = pd.read_csv("data/processed/country_regions.csv")  # expects columns: iso_code, region
 df = pd.merge(df, region_df, on="iso_code", how="left")
 
-# One-hot encode region
-region_dummies = pd.get_dummies(df["region"], prefix="region")
-df = pd.concat([df, region_dummies], axis=1)
-
-# Encode region as numeric to create interaction
-
-region_codes = {region: i for i, region in enumerate(df["region"].dropna().unique())}
-df["region_code"] = df["region"].map(region_codes)
+# Keep region, income group and pressure level as categoricals with a persisted, append-only vocabulary
+vocabulary = update_vocabulary(load_vocabulary(VOCABULARY_PATH), df)
+df = apply_vocabulary(df, vocabulary)
 
 # Encode year as a numeric feature
-df["year_encoded"] = df["year"].astype(int)
+df["year_encoded"] = df["year"]
 
-# Region × income interaction
-df["region_x_income"] = df["region_code"] * df["income_group_encoded"]
-
-train_df = df[df["year"] < str(test_year)].copy()
-test_df = df[df["year"] == str(test_year)].copy()
+train_df = df[df["year"] < test_year].copy()
+test_df = df[df["year"] == test_year].copy()
 
  # Best-of-the-Best Feature Set: Policy + Emissions + Macro + Temporal
 features = [
@@ -111,11 +113,10 @@ features = [
     "policy_lag_years",
     "co2_per_capita",
     "emissions_per_person",
-    "region_x_income",
     "log_gdp",
     "log_population",
-    "year_encoded"
-]
+    "year_encoded",
+] + CATEGORICAL_FEATURES
 X = df[features]
 y = df["next_year_growth"]
 
@@ -130,57 +131,96 @@ y_train = train_df["next_year_growth"]
 X_test = test_df[features]
 y_test = test_df["next_year_growth"]
 
-# Build pipeline with scaling
-pipe = Pipeline([
-    ("scaler", StandardScaler()),
-    ("model", XGBClassifier(random_state=42, scale_pos_weight=scale_pos_weight, use_label_encoder=False, eval_metric="logloss"))
-])
-
-# Random search for hyperparameter tuning
-param_grid = {
-    "model__n_estimators": [100, 200, 300],
-    "model__max_depth": [3, 5, 7],
-    "model__learning_rate": [0.01, 0.1, 0.2],
-    "model__subsample": [0.8, 1.0],
-}
+# Warm-start update: continue boosting the saved model on years it has not seen yet
+model, members = None, None
+meta = load_model_meta(META_PATH) if UPDATE_MODE else None
+if UPDATE_MODE and meta is None:
+    print(f"Update mode: no {META_PATH} found, running full retrain")
+elif meta is not None:
+    new_rows = df["year"] > meta["trained_through_year"]
+    X_new, y_new = X[new_rows], y[new_rows]
+    saved_model = joblib.load(MODEL_PATH)
+    saved_members = joblib.load(ENSEMBLE_PATH)
+    if not new_rows.any():
+        print(f"Update mode: no rows after {meta['trained_through_year']}, keeping the saved model")
+        model, members = saved_model, saved_members
+        best_threshold, best_f1 = meta["threshold"], meta["f1"]
+        trained_through_year = meta["trained_through_year"]
+    else:
+        # Drift checks on rows the saved model has never seen
+        last_seen = df["year"] == meta["trained_through_year"]
+        drift = feature_drift(saved_model, X[last_seen], X_new)
+        # Score the saved model at its stored threshold; re-tuning on these rows would flatter it
+        new_f1 = f1_score(y_new, (saved_model.predict_proba(X_new)[:, 1] >= meta["threshold"]).astype(int))
+        print(f"Update mode: {new_rows.sum()} new rows, max feature shift {drift.max():.2f} ({drift.idxmax()}), F1 {new_f1:.4f} (was {meta['f1']:.4f})")
+        if drift.max() > DRIFT_LIMIT or new_f1 < meta["f1"] - F1_DROP_LIMIT:
+            print("Drift limit crossed, falling back to full retrain")
+        else:
+            model = continue_boosting(saved_model, X_new, y_new, UPDATE_ROUNDS)
+            members = [continue_boosting(member, X_new, y_new, UPDATE_ROUNDS) for member in saved_members]
+            trained_through_year = int(df.loc[new_rows, "year"].max())
+
+            # Keep the stored threshold and held-out F1: the new trees were fitted to X_new,
+            # so re-tuning on it would save an in-sample F1 for the next drift check to chase
+            best_threshold, best_f1 = meta["threshold"], meta["f1"]
+
+if model is None:
+    # Build pipeline: scale numeric features, pass categoricals to XGBoost natively
+    pipe = build_pipeline(X_train, random_state=42, scale_pos_weight=scale_pos_weight, use_label_encoder=False, eval_metric="logloss")
+
+    # Random search for hyperparameter tuning
+    param_grid = {
+        "model__n_estimators": [100, 200, 300],
+        "model__max_depth": [3, 5, 7],
+        "model__learning_rate": [0.01, 0.1, 0.2],
+        "model__subsample": [0.8, 1.0],
+    }
+
+    search = RandomizedSearchCV(pipe, param_grid, n_iter=10, cv=3, scoring="accuracy", random_state=42)
+    search.fit(X_train, y_train)
+    model = search.best_estimator_
+    trained_through_year = int(train_df["year"].max())
+
+    # Find best threshold for F1 score using validation set
+    y_proba = model.predict_proba(X_test)[:, 1]
+    best_threshold, best_f1 = best_f1_threshold(y_test, y_proba)
+    print(f"Best F1 threshold: {best_threshold:.2f} (F1 = {best_f1:.4f})")
+
+    # Replace final prediction with best-threshold predictions
+    y_pred = (y_proba >= best_threshold).astype(int)
+    if not forecast_only:
+        print("Classification Report (Threshold Tuned):")
+        print(classification_report(y_test, y_pred))
+
+    # Fit a country-block bootstrap ensemble with the tuned hyperparameters (members train in parallel)
+    member_params = {key.replace("model__", ""): value for key, value in search.best_params_.items()}
+    member_params.update(scale_pos_weight=scale_pos_weight, eval_metric="logloss")
+    members = fit_ensemble(X_train, y_train, train_df["country"], member_params, n_members=N_ENSEMBLE_MEMBERS)
 
-search = RandomizedSearchCV(pipe, param_grid, n_iter=10, cv=3, scoring="accuracy", random_state=42)
-search.fit(X_train, y_train)
+# Update full-dataset predictions using best threshold
+df["predicted_growth"] = (model.predict_proba(X)[:, 1] >= best_threshold).astype(int)
 
+# Mean risk probability and 90% interval across members for every row
+risk = summarize(ensemble_predict_proba(members, X))
+df[["risk_probability", "risk_lower", "risk_upper"]] = risk.to_numpy()
 
-# Threshold tuning for best F1 score
-from sklearn.metrics import f1_score
-import numpy as np
+ # Save predictions
+df.to_csv(TRAINED_PREDICTIONS_PATH, index=False)
+print(f"✅ Predictions saved to {TRAINED_PREDICTIONS_PATH}")
 
-# Find best threshold for F1 score using validation set
-y_proba = search.predict_proba(X_test)[:, 1]
-thresholds = np.linspace(0.1, 0.9, 81)
-best_f1, best_threshold = 0, 0.5
-for t in thresholds:
-    y_pred_thresh = (y_proba >= t).astype(int)
-    f1 = f1_score(y_test, y_pred_thresh)
-    if f1 > best_f1:
-        best_f1 = f1
-        best_threshold = t
-
-print(f"Best F1 threshold: {best_threshold:.2f} (F1 = {best_f1:.4f})")
-
-# Replace final prediction with best-threshold predictions
-y_pred = (y_proba >= best_threshold).astype(int)
-if not forecast_only:
-    print("Classification Report (Threshold Tuned):")
-    print(classification_report(y_test, y_pred))
+# Save the model
+joblib.dump(model, MODEL_PATH)
+print(f"✅ Tuned model saved to {MODEL_PATH}")
 
-# Update full-dataset predictions using best threshold
-df["predicted_growth"] = (search.predict_proba(X)[:, 1] >= best_threshold).astype(int)
+joblib.dump(members, ENSEMBLE_PATH)
+print(f"✅ {len(members)}-member bootstrap ensemble saved to {ENSEMBLE_PATH}")
 
- # Save predictions
-df.to_csv("data/co2_multi_year_predictions.csv", index=False)
-print("✅ Predictions saved to data/co2_multi_year_predictions.csv")
+save_vocabulary(vocabulary, VOCABULARY_PATH)
 
-# Save the model
-joblib.dump(search.best_estimator_, "data/multi_year_co2_model.pkl")
-print("✅ Tuned model saved to data/multi_year_co2_model.pkl")
+# Record what the saved model has seen so update mode knows which rows are new
+save_model_meta(META_PATH, trained_through_year=trained_through_year, threshold=float(best_threshold), f1=float(best_f1))
+print(f"To release: copy {TRAINED_PREDICTIONS_PATH} to {DEPLOYED_PREDICTIONS_PATH} and {MODEL_PATH} "
+      f"(with its _meta.json and _categories.json) to {DEPLOYED_MODEL_PATH}")
 
 # Visualize feature importances (locally)
 import matplotlib.pyplot as plt
@@ -188,7 +228,7 @@ import seaborn as sns
 
 # Get feature importances from the trained XGBoost model
 feature_names = list(X.columns)
-importances = search.best_estimator_.named_steps["model"].feature_importances_
+importances = model.named_steps["model"].feature_importances_
 
 # Plot
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,38 @@
+import streamlit as st
+
+# Filterable columns and their widget labels, in display order
+FILTER_COLUMNS = {
+    "region": "Region",
+    "income_group": "Income group",
+    "pressure_level": "Policy pressure",
+}
+INCOME_LABELS = {"L": "Low", "LM": "Lower-middle", "UM": "Upper-middle", "H": "High"}
+
+
+def filter_controls(df, key):
+    """Render year, region, income-group and pressure-level filters in one row.
+
+    Meant to be called inside an `st.fragment`, so changing a filter only
+    reruns the fragment. Empty multiselects mean "all". Returns the filtered
+    rows (a single vectorized mask over the cached frame) and the selected year.
+    """
+    available = [col for col in FILTER_COLUMNS if col in df.columns]
+    controls = st.columns(len(available) + 1)
+
+    years = sorted(df["year"].dropna().unique().tolist(), reverse=True)
+    year = controls[0].selectbox("Year", years, index=0, key=f"{key}_year")
+    mask = df["year"] == year
+
+    for slot, col in zip(controls[1:], available):
+        values = df[col].dropna().astype(str).str.strip()
+        options = sorted(values[values != ""].unique())
+        chosen = slot.multiselect(
+            FILTER_COLUMNS[col],
+            options,
+            format_func=(lambda code: INCOME_LABELS.get(code, code)) if col == "income_group" else str,
+            key=f"{key}_{col}",
+        )
+        if chosen:
+            mask &= df[col].astype(str).str.strip().isin(chosen)
+
+    return df[mask].copy(), year
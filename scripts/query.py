@@ -0,0 +1,101 @@
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+
+# Processed tables the dashboard reads, by short name.
+# A Parquet file or directory with the same stem takes precedence over the CSV.
+DATASETS = {
+    "co2_country_latest": "data/processed/co2_country_latest.csv",
+    "co2_multi_year_predictions": "data/processed/co2_multi_year_predictions.csv",
+    "co2_policy_merged": "data/processed/co2_policy_merged.csv",
+    "co2_predictions_with_income": "data/processed/co2_predictions_with_income.csv",
+    "country_regions": "data/processed/country_regions.csv",
+    "eps_map_view": "data/processed/views/eps_map_view.parquet",
+    "growth_risk_view": "data/processed/views/growth_risk_view.parquet",
+    "historical_emissions": "data/processed/historical_emissions.csv",
+    "prediction_attributions": "data/processed/prediction_attributions.parquet",
+    "predicted_growth_view": "data/processed/views/predicted_growth_view.parquet",
+    "regional_policy": "data/processed/regional_policy.csv",
+    "tier_events": "data/processed/tier_events",
+}
+
+_COMPARISONS = {
+    "==": lambda field, value: field == value,
+    "!=": lambda field, value: field != value,
+    "<": lambda field, value: field < value,
+    "<=": lambda field, value: field <= value,
+    ">": lambda field, value: field > value,
+    ">=": lambda field, value: field >= value,
+    "in": lambda field, value: field.isin(list(value)),
+    "not in": lambda field, value: ~field.isin(list(value)),
+}
+
+
+def load_dataset(name):
+    """Open a processed table as a pyarrow dataset without reading it."""
+    path = DATASETS.get(name, name)
+    stem, ext = os.path.splitext(path)
+    if ext == ".csv" and os.path.exists(stem + ".parquet"):
+        path, ext = stem + ".parquet", ".parquet"
+    if ext == ".parquet" or os.path.isdir(path):
+        return ds.dataset(path, format="parquet")
+    # Empty CSV fields are nulls, as pd.read_csv reads them, not empty strings
+    csv_format = ds.CsvFileFormat(convert_options=pv.ConvertOptions(strings_can_be_null=True))
+    return ds.dataset(path, format=csv_format)
+
+
+def build_filter(filters):
+    """Combine (column, op[, value]) tuples into one pyarrow expression (AND)."""
+    expression = None
+    for column, op, *value in filters or []:
+        field = ds.field(column)
+        if op == "not_null":
+            term = field.is_valid()
+        elif op == "is_null":
+            term = field.is_null()
+        elif op in _COMPARISONS:
+            term = _COMPARISONS[op](field, value[0])
+        else:
+            raise ValueError(f"Unsupported filter operator: {op!r}")
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def query(name, columns=None, filters=None, group_by=None, aggregations=None):
+    """Scan a processed table with filters applied before materialization.
+
+    `filters` is a list of (column, op, value) tuples, where op is one of
+    ==, !=, <, <=, >, >=, in, not in, or a (column, "not_null"/"is_null") pair.
+    `aggregations` is a list of (column, function) pairs such as ("co2", "sum");
+    result columns are named "<column>_<function>" as in pyarrow's group_by.
+    """
+    dataset = load_dataset(name)
+    group_by = list(group_by or [])
+    aggregations = list(aggregations or [])
+
+    if aggregations:
+        needed = group_by + [col for col, _ in aggregations if col not in group_by]
+    else:
+        needed = list(columns) if columns is not None else None
+
+    table = dataset.to_table(columns=needed, filter=build_filter(filters))
+
+    if aggregations:
+        if group_by:
+            table = table.group_by(group_by).aggregate(aggregations)
+            table = table.select(group_by + [f"{col}_{func}" for col, func in aggregations])
+        else:
+            table = pa.table({
+                f"{col}_{func}": [getattr(pc, func)(table[col]).as_py()]
+                for col, func in aggregations
+            })
+    return table.to_pandas()
+
+
+def max_value(name, column, filters=None):
+    """Largest value of one column, scanning only that column."""
+    table = load_dataset(name).to_table(columns=[column], filter=build_filter(filters))
+    return pc.max(table[column]).as_py()
@@ -0,0 +1,150 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from scripts.features import apply_vocabulary, categorical_features, load_vocabulary
+from scripts.model_paths import DEPLOYED_MODEL_PATH, meta_path, vocabulary_path
+from scripts.query import max_value, query
+from scripts.warm_start import load_model_meta
+
+MODEL_PATH = DEPLOYED_MODEL_PATH
+SCENARIOS_PATH = "data/processed/scenarios.parquet"
+FORECASTS_PATH = "data/processed/scenario_forecasts.parquet"
+
+# Default planning grid: annual EPS change × GDP growth × population growth
+EPS_CHANGES = [-0.1, 0.0, 0.1, 0.2, 0.3]
+GDP_GROWTH = [0.0, 0.01, 0.02, 0.03]
+POPULATION_GROWTH = [0.0, 0.005, 0.01]
+HORIZON = 10
+
+EPS_RANGE = (0.0, 6.0)
+EPS_POLICY_LEVEL = 3  # EPS level that starts the policy lag clock, as in training
+
+STATE_COLUMNS = ["country", "year", "co2", "co2_per_capita", "gdp", "population", "eps_score", "first_eps_year"]
+
+# Model features recomputed every step; any other feature is held at each country's latest value
+DYNAMIC_FEATURES = [
+    "eps_score", "policy_lag_years", "co2_per_capita", "emissions_per_person",
+    "log_gdp", "log_population", "year_encoded",
+]
+
+
+def scenario_grid(eps_changes=EPS_CHANGES, gdp_growth=GDP_GROWTH, population_growth=POPULATION_GROWTH):
+    """Every combination of the scenario assumptions, one row per scenario_id."""
+    grid = pd.MultiIndex.from_product(
+        [eps_changes, gdp_growth, population_growth],
+        names=["eps_change", "gdp_growth", "population_growth"],
+    ).to_frame(index=False)
+    grid.insert(0, "scenario_id", np.arange(len(grid)))
+    return grid
+
+
+def growth_rates(history, since=1990):
+    """Per-country median CO₂ growth in years that rose and years that fell.
+
+    The classifier only says whether emissions rise, so these rates turn its
+    probability into an expected change when rolling CO₂ forward.
+    """
+    recent = history[(history["year"] >= since) & (history["co2"] > 0)].copy()
+    recent["rate"] = recent["next_year_co2"] / recent["co2"] - 1
+    up = recent[recent["rate"] > 0].groupby("country")["rate"].median()
+    down = recent[recent["rate"] <= 0].groupby("country")["rate"].median()
+    rates = pd.DataFrame({"up_rate": up, "down_rate": down})
+    return rates.fillna({"up_rate": up.median(), "down_rate": down.median()})
+
+
+def run_scenarios(pipeline, base, rates, scenarios, horizon=HORIZON, threshold=0.5):
+    """Roll every scenario × country forward `horizon` years.
+
+    State is held as (scenario, country) arrays; each step scores all pairs
+    with one predict_proba call, then feeds the expected CO₂ change back into
+    the next step's features.
+    """
+    features = list(pipeline.feature_names_in_)
+    n_scen, n_cty = len(scenarios), len(base)
+
+    def tile(col):
+        return np.broadcast_to(base[col].to_numpy(dtype=float), (n_scen, n_cty)).copy()
+
+    def per_scenario(col):
+        return scenarios[col].to_numpy(dtype=float)[:, None]
+
+    co2, gdp, population, eps = tile("co2"), tile("gdp"), tile("population"), tile("eps_score")
+    first_eps_year = tile("first_eps_year")
+    co2_0, pop_0, co2_per_capita_0 = tile("co2"), tile("population"), tile("co2_per_capita")
+    static = {}
+    for name in features:
+        if name in DYNAMIC_FEATURES:
+            continue
+        if isinstance(base[name].dtype, pd.CategoricalDtype):
+            static[name] = pd.Categorical.from_codes(np.tile(base[name].cat.codes.to_numpy(), n_scen), dtype=base[name].dtype)
+        else:
+            static[name] = np.tile(base[name].to_numpy(dtype=float), n_scen)
+    up = rates.reindex(base["country"])["up_rate"].to_numpy()[None, :]
+    down = rates.reindex(base["country"])["down_rate"].to_numpy()[None, :]
+    start_year = int(base["year"].max())
+
+    steps = []
+    for step in range(1, horizon + 1):
+        year = start_year + step
+        eps = np.clip(eps + per_scenario("eps_change"), *EPS_RANGE)
+        gdp = gdp * (1 + per_scenario("gdp_growth"))
+        population = population * (1 + per_scenario("population_growth"))
+        first_eps_year = np.where(np.isnan(first_eps_year) & (eps > EPS_POLICY_LEVEL), year, first_eps_year)
+
+        columns = {
+            "eps_score": eps,
+            "policy_lag_years": np.clip(year - first_eps_year, 0, None),
+            "co2_per_capita": co2_per_capita_0 * (co2 / co2_0) / (population / pop_0),
+            "emissions_per_person": co2 / population,
+            "log_gdp": np.log1p(gdp),
+            "log_population": np.log1p(population),
+            "year_encoded": np.full((n_scen, n_cty), year, dtype=float),
+        }
+        X = pd.DataFrame({name: columns[name].ravel() if name in columns else static[name] for name in features})
+        proba = pipeline.predict_proba(X)[:, 1].reshape(n_scen, n_cty)
+
+        steps.append(pd.DataFrame({
+            "scenario_id": np.repeat(scenarios["scenario_id"].to_numpy(), n_cty),
+            "country": np.tile(base["country"].to_numpy(), n_scen),
+            "year": year,
+            "eps_score": eps.ravel(),
+            "gdp": gdp.ravel(),
+            "population": population.ravel(),
+            "co2": co2.ravel(),
+            "risk_probability": proba.ravel().astype(np.float32),
+            "predicted_growth": (proba.ravel() >= threshold).astype(np.int8),
+        }))
+
+        # Expected CO₂ for next year from the rise/fall probability
+        co2 = co2 * (1 + proba * up + (1 - proba) * down)
+
+    return pd.concat(steps, ignore_index=True)
+
+
+def build_forecasts(scenarios=None, horizon=HORIZON, model_path=MODEL_PATH):
+    pipeline = joblib.load(model_path)
+    meta = load_model_meta(meta_path(model_path))  # threshold tuned for this pickle, not the latest training run
+    threshold = meta["threshold"] if meta else 0.5
+    scenarios = scenario_grid() if scenarios is None else scenarios
+
+    history = query("co2_multi_year_predictions", columns=["country", "year", "co2", "next_year_co2"])
+    latest_year = max_value("co2_multi_year_predictions", "year")
+    static = [name for name in pipeline.feature_names_in_ if name not in DYNAMIC_FEATURES and name not in STATE_COLUMNS]
+    base = query("co2_multi_year_predictions", columns=STATE_COLUMNS + static, filters=[("year", "==", latest_year)])
+    categorical = categorical_features(pipeline)
+    if categorical:
+        base = apply_vocabulary(base, load_vocabulary(vocabulary_path(model_path)), categorical)
+
+    forecasts = run_scenarios(pipeline, base, growth_rates(history), scenarios, horizon, threshold)
+    for frame, dest in [(scenarios, SCENARIOS_PATH), (forecasts, FORECASTS_PATH)]:
+        frame.to_parquet(dest + ".tmp", index=False)
+        os.replace(dest + ".tmp", dest)
+    return scenarios, forecasts
+
+
+if __name__ == "__main__":
+    scenarios, forecasts = build_forecasts()
+    print(f"✅ {len(scenarios)} scenarios × {forecasts['country'].nunique()} countries × {HORIZON} years saved to {FORECASTS_PATH}")
@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts.explain_predictions import prediction_version
+from scripts.materialize_views import load_view, manifest_version, views_version
+from scripts.query import DATASETS, query
+
+# Run after `python -m scripts.materialize_views` (new data) or a retrain (new model)
+EVENTS_DIR = DATASETS["tier_events"]
+STATE_PATH = "data/processed/tier_state.parquet"
+
+# Last-seen value of each measure per country-year, sorted on these keys
+KEYS = ["measure", "country", "year"]
+# What makes two detected changes the same change
+EVENT_KEYS = ["measure", "change", "country", "from_year", "year", "from_value", "to_value"]
+EVENT_COLUMNS = EVENT_KEYS + ["from_version", "to_version", "detected_at"]
+
+
+def snapshot():
+    """Current growth tier and prediction flag per country-year, in long form sorted by KEYS.
+
+    Tiers are versioned by the views release they were read from, flags by
+    the model + predictions release.
+    """
+    growth = load_view("growth_risk_view")
+    predicted = load_view("predicted_growth_view")
+    frames = [
+        pd.DataFrame({
+            "measure": "growth_risk",
+            "country": growth["country"],
+            "year": growth["year"].astype("int64"),
+            "value": growth["growth_risk"].astype(str),
+            "version": manifest_version() or views_version(),
+        }),
+        pd.DataFrame({
+            "measure": "predicted_growth",
+            "country": predicted["country"],
+            "year": predicted["year"].astype("int64"),
+            "value": predicted["predicted_growth"].astype(int).astype(str),
+            "version": prediction_version(),
+        }),
+    ]
+    return pd.concat(frames, ignore_index=True).sort_values(KEYS, kind="stable", ignore_index=True)
+
+
+def year_transitions(snap):
+    """Rows whose value differs from the same country's value in the year before.
+
+    With the snapshot sorted by KEYS this is one shifted comparison over the
+    whole table: row i is a transition when row i - 1 has the same measure
+    and country, is exactly one year earlier, and has a different value.
+    Pairs either side of a gap in the series are not compared.
+    """
+    measure, country = snap["measure"].to_numpy(), snap["country"].to_numpy()
+    year, value, version = snap["year"].to_numpy(), snap["value"].to_numpy(), snap["version"].to_numpy()
+    moved = (
+        (measure[1:] == measure[:-1]) & (country[1:] == country[:-1])
+        & (year[1:] == year[:-1] + 1) & (value[1:] != value[:-1])
+    )
+    idx = np.flatnonzero(moved) + 1
+    return pd.DataFrame({
+        "measure": measure[idx],
+        "change": "year",
+        "country": country[idx],
+        "from_year": year[idx - 1],
+        "year": year[idx],
+        "from_value": value[idx - 1],
+        "to_value": value[idx],
+        "from_version": version[idx - 1],
+        "to_version": version[idx],
+    })
+
+
+def detect_changes(old, new):
+    """Changes in `new` that `old` had not already produced.
+
+    - version: the same country-year now has a different value (new data or model)
+    - year: a move between consecutive years; only recomputed for the
+      (measure, country) series that gained, lost or changed a row, and
+      emitted only if the previous snapshot did not already contain it
+    """
+    joined = old.merge(new, on=KEYS, how="outer", suffixes=("_old", "_new"), indicator=True)
+    both = joined["_merge"] == "both"
+    changed = both & (joined["value_old"] != joined["value_new"])
+
+    version_changes = joined[changed]
+    version_changes = pd.DataFrame({
+        "measure": version_changes["measure"],
+        "change": "version",
+        "country": version_changes["country"],
+        "from_year": version_changes["year"],
+        "year": version_changes["year"],
+        "from_value": version_changes["value_old"],
+        "to_value": version_changes["value_new"],
+        "from_version": version_changes["version_old"],
+        "to_version": version_changes["version_new"],
+    })
+
+    affected = joined.loc[changed | ~both, ["measure", "country"]].drop_duplicates()
+    new_moves = year_transitions(new.merge(affected, on=["measure", "country"]).sort_values(KEYS, kind="stable"))
+    old_moves = year_transitions(old.merge(affected, on=["measure", "country"]).sort_values(KEYS, kind="stable"))
+    seen = new_moves.merge(old_moves[EVENT_KEYS], on=EVENT_KEYS, how="left", indicator=True)["_merge"] == "both"
+    year_changes = new_moves[~seen.to_numpy()]
+
+    events = pd.concat([version_changes, year_changes], ignore_index=True)
+    return events.astype({"from_year": "int64", "year": "int64"}).sort_values(["measure", "country", "year", "change"], ignore_index=True)
+
+
+def update_events(events_dir=EVENTS_DIR, state_path=STATE_PATH):
+    """Diff the current snapshot against the last one and append any changes to the event log.
+
+    Each run adds one new Parquet file to the log directory (existing files
+    are never rewritten), then replaces the saved snapshot. The first run
+    logs the full year-over-year history.
+    """
+    new = snapshot()
+    if os.path.exists(state_path):
+        old = pd.read_parquet(state_path)
+    else:
+        old = new.iloc[:0]
+
+    events = detect_changes(old, new)
+    if len(events):
+        events["detected_at"] = pd.Timestamp.now(tz="UTC").floor("s")
+        os.makedirs(events_dir, exist_ok=True)
+        name = f"events-{events['detected_at'].iloc[0]:%Y%m%dT%H%M%S}.parquet"
+        # Leading underscore keeps the partial file out of the dataset until it is complete
+        tmp = os.path.join(events_dir, f"_{name}.tmp")
+        events[EVENT_COLUMNS].to_parquet(tmp, index=False)
+        os.replace(tmp, os.path.join(events_dir, name))
+
+    new.to_parquet(state_path + ".tmp", index=False)
+    os.replace(state_path + ".tmp", state_path)
+    return events
+
+
+def events_version(events_dir=EVENTS_DIR):
+    """Names of the event files written so far; changes whenever a run appends to the log."""
+    if not os.path.isdir(events_dir):
+        return ()
+    return tuple(sorted(name for name in os.listdir(events_dir) if name.startswith("events-") and name.endswith(".parquet")))
+
+
+def transitions(measure=None, change=None, year=None, countries=None):
+    """Logged tier moves and flag flips, optionally narrowed, newest detection first."""
+    if not os.path.isdir(EVENTS_DIR):
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    filters = []
+    if measure is not None:
+        filters.append(("measure", "==", measure))
+    if change is not None:
+        filters.append(("change", "==", change))
+    if year is not None:
+        filters.append(("year", "==", year))
+    if countries is not None:
+        filters.append(("country", "in", countries))
+    df = query("tier_events", filters=filters)
+    return df.sort_values(["detected_at", "measure", "country", "year"], ascending=[False, True, True, True], ignore_index=True)
+
+
+if __name__ == "__main__":
+    events = update_events()
+    counts = events.groupby(["measure", "change"]).size().to_dict() if len(events) else {}
+    print(f"✅ {len(events)} new tier/flag changes appended to {EVENTS_DIR} {counts}")
@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import f1_score
+
+from scripts.features import numeric_scaler
+
+
+def best_f1_threshold(y_true, proba, thresholds=np.linspace(0.1, 0.9, 81)):
+    """Probability cut-off with the best F1 score, and that score."""
+    best_f1, best_threshold = 0, 0.5
+    for t in thresholds:
+        f1 = f1_score(y_true, (proba >= t).astype(int))
+        if f1 > best_f1:
+            best_f1, best_threshold = f1, t
+    return best_threshold, best_f1
+
+
+def feature_drift(pipeline, X_ref, X_new):
+    """Shift of each feature's mean between reference and new rows, in training standard deviations.
+
+    Comparing against the last year the model saw (rather than all history)
+    keeps steadily trending features such as the year from always flagging.
+    The scale comes from the pipeline's fitted StandardScaler, so only the
+    numeric features are checked.
+    """
+    scaler, columns = numeric_scaler(pipeline)
+    ref_mean = np.nanmean(X_ref[columns].to_numpy(dtype=float), axis=0)
+    new_mean = np.nanmean(X_new[columns].to_numpy(dtype=float), axis=0)
+    return pd.Series(np.abs(new_mean - ref_mean) / scaler.scale_, index=columns).fillna(0)
+
+
+def continue_boosting(pipeline, X_new, y_new, n_rounds):
+    """Add `n_rounds` trees fitted on the new rows to the pipeline's booster.
+
+    The scaler is kept as is because existing trees split on its scaled
+    values. The native training API is used so that a new year containing
+    only one class can still be learned from.
+    """
+    model = pipeline.named_steps["model"]
+    X_scaled = pipeline.named_steps["scaler"].transform(X_new)
+    dtrain = xgb.DMatrix(X_scaled, label=np.asarray(y_new), missing=np.nan, enable_categorical=True)
+    model._Booster = xgb.train(
+        model.get_xgb_params(),
+        dtrain,
+        num_boost_round=n_rounds,
+        xgb_model=model.get_booster(),
+    )
+    model.set_params(n_estimators=model.get_booster().num_boosted_rounds())
+    return pipeline
+
+
+def load_model_meta(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_model_meta(path, **meta):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)